@@ -0,0 +1,448 @@
+"""
+✔️ Noyaux de calcul du solveur, compilés en code natif avec Numba.
+
+Les fonctions les plus sollicitées par le backtracking (comptage des
+gratte-ciels visibles, vérification des indices, test de placement) sont
+regroupées ici sous forme de fonctions libres opérant uniquement sur des
+tableaux numpy : plateau en int8, indices en int32. Aucun objet Python
+n'entre dans les boucles internes, ce qui permet à @njit de tout compiler
+en mode nopython. Le code compilé est mis en cache sur disque (cache=True)
+pour éviter de recompiler à chaque lancement. Numba est optionnel : s'il
+n'est pas installé, les mêmes fonctions tournent en Python pur.
+
+L'axe est passé en entier simple (ROW = 0, COL = 1) car les Enum ne sont
+pas supportés en mode nopython.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba absent : les noyaux restent du Python pur, plus lents mais
+    # fonctionnellement identiques (ils n'utilisent que des tableaux numpy).
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorate(func):
+            return func
+        return decorate
+
+
+# Axe de parcours, en entier simple : les Enum ne sont pas supportés en mode
+# nopython, et Numba fige ces globales en constantes de compilation.
+ROW = 0
+COL = 1
+
+
+@njit(cache=True, boundscheck=False)
+def visible_run(board, r0, c0, dr, dc, n):
+    """
+    Balaye une ligne de vue du plateau jusqu'à la première cellule vide.
+
+    Une seule fonction couvre les quatre directions : le point de départ
+    (r0, c0) et le pas (dr, dc) déterminent la ligne, la colonne et le sens
+    du parcours, sans construire de vue ni de liste intermédiaire.
+
+    Args:
+        board (numpy.ndarray): Le plateau actuel (int8, N x N).
+        r0, c0 (int): La cellule de départ (côté de l'indice).
+        dr, dc (int): Le pas de parcours (+-1 sur un axe, 0 sur l'autre).
+        n (int): La taille du plateau.
+
+    Returns:
+        tuple[int, int, int]: (visibles, hauteur maximale, cellules
+        parcourues avant la première vide).
+    """
+    count = 0
+    max_ = 0
+    filled = 0
+    for i in range(n):
+        v = board[r0 + i * dr, c0 + i * dc]
+        if v == 0:
+            break
+        filled += 1
+        if v > max_:
+            count += 1
+            max_ = v
+    return count, max_, filled
+
+
+@njit(cache=True, boundscheck=False)
+def pack_line(line):
+    """
+    Encode une ligne complète en un mot de 32 bits, 4 bits par cellule.
+
+    Les hauteurs vont de 1 à N <= 8, donc chaque cellule tient sur 4 bits
+    et une ligne entière tient dans un seul registre 32 bits.
+
+    Args:
+        line (numpy.ndarray): Une ligne complète du plateau (vue 1D).
+
+    Returns:
+        numpy.uint32: La clé compacte de la ligne.
+    """
+    key = np.uint32(0)
+    for j in range(line.shape[0]):
+        key |= np.uint32(line[j]) << np.uint32(4 * j)
+    return key
+
+
+@njit(cache=True, boundscheck=False)
+def row_is_candidate(line, index, row_keys, row_key_counts):
+    """
+    Teste si une ligne complète figure parmi les permutations candidates.
+
+    La ligne est compactée par pack_line puis cherchée par dichotomie dans
+    le tableau trié des clés candidates de cette ligne.
+
+    Args:
+        line (numpy.ndarray): La ligne complète à tester.
+        index (int): L'indice de la ligne.
+        row_keys (numpy.ndarray): Clés compactes triées par ligne (uint32, N x K).
+        row_key_counts (numpy.ndarray): Nombre de clés valides par ligne (int32).
+
+    Returns:
+        bool: True si la ligne est une permutation candidate, False sinon.
+    """
+    key = pack_line(line)
+    lo = 0
+    hi = row_key_counts[index]
+    while lo < hi:
+        mid = (lo + hi) // 2
+        value = row_keys[index, mid]
+        if value == key:
+            return True
+        elif value < key:
+            lo = mid + 1
+        else:
+            hi = mid
+    return False
+
+
+@njit(cache=True, boundscheck=False)
+def respect_clues(board, index, axis, left, right, top, down, row_keys, row_key_counts):
+    """
+    Vérifie si les indices sont respectés pour la ligne ou colonne donnée.
+
+    Tant que la ligne est incomplète, un test partiel borne des deux côtés
+    le comptage final à partir des préfixes déjà posés : depuis chaque
+    extrémité, le préfixe contigu de cellules remplies fixe un nombre de
+    visibles acquis (borne inférieure) auquel les cellules restantes ne
+    peuvent ajouter qu'au plus min(cellules restantes, hauteurs au-dessus
+    du maximum du préfixe) visibles (borne supérieure). L'indice doit
+    tomber dans cet intervalle. Une ligne complète est validée par
+    appartenance à l'ensemble de ses permutations candidates (clé compacte
+    + dichotomie) ; une colonne complète par les deux comptages de
+    visibilité exacts.
+
+    Args:
+        board (numpy.ndarray): Le plateau actuel (int8, N x N).
+        index (int): L'indice de la ligne ou de la colonne à vérifier.
+        axis (int): 0 pour une ligne, 1 pour une colonne.
+        left, right (numpy.ndarray): Indices de gauche/droite par ligne (int32).
+        top, down (numpy.ndarray): Indices de haut/bas par colonne (int32).
+        row_keys (numpy.ndarray): Clés compactes triées par ligne (uint32).
+        row_key_counts (numpy.ndarray): Nombre de clés valides par ligne (int32).
+
+    Returns:
+        bool: True si les indices sont respectés, False sinon.
+    """
+    n = board.shape[0]
+
+    # Les deux extrémités de la ligne de vue, couvertes par le même balayage
+    # strié visible_run (aucune vue ni liste intermédiaire sur le chemin chaud)
+    if axis == ROW:
+        start_clue = left[index]
+        end_clue = right[index]
+        r0, c0, dr, dc = index, 0, 0, 1
+    else:
+        start_clue = top[index]
+        end_clue = down[index]
+        r0, c0, dr, dc = 0, index, 1, 0
+
+    count, max_, filled = visible_run(board, r0, c0, dr, dc, n)
+
+    if filled == n:
+        # Cas rare (une fois par ligne achevée) : ligne complète
+        if axis == ROW:
+            # L'appartenance aux permutations candidates implique les indices
+            return row_is_candidate(board[index], index, row_keys, row_key_counts)
+        if count != start_clue:
+            return False
+        count, max_, filled = visible_run(
+            board, r0 + (n - 1) * dr, c0 + (n - 1) * dc, -dr, -dc, n)
+        return count == end_clue
+
+    # Préfixe contigu rempli depuis le début : comptage acquis + marge
+    if count > start_clue:
+        return False
+    slack = min(n - filled, n - max_)
+    if count + slack < start_clue:
+        return False
+
+    # Même encadrement depuis l'autre extrémité avec l'indice d'arrivée
+    count, max_, filled = visible_run(
+        board, r0 + (n - 1) * dr, c0 + (n - 1) * dc, -dr, -dc, n)
+    if count > end_clue:
+        return False
+    slack = min(n - filled, n - max_)
+    return count + slack >= end_clue
+
+
+@njit(cache=True, boundscheck=False)
+def can_place(board, r, c, num, row_mask, col_mask, allowed, left, right, top, down,
+              row_keys, row_key_counts):
+    """
+    Teste si num peut être placé dans la cellule (r, c).
+
+    Le test de doublon se fait en O(1) sur les masques de bits : le bit k
+    de row_mask[r] (resp. col_mask[c]) vaut 1 si la valeur k+1 est déjà
+    présente dans la ligne r (resp. la colonne c). Comme is_valid
+    auparavant, la fonction écrit num dans la cellule avant de vérifier
+    les indices ; l'appelant remet la cellule à 0 en cas d'échec.
+
+    Args:
+        board (numpy.ndarray): Le plateau actuel (int8, N x N).
+        r (int): L'indice de ligne.
+        c (int): L'indice de colonne.
+        num (int): Le nombre à placer.
+        row_mask, col_mask (numpy.ndarray): Masques des valeurs présentes (int32).
+        allowed (numpy.ndarray): Masques des valeurs envisageables par cellule (int32).
+        left, right, top, down (numpy.ndarray): Les indices du jeu (int32).
+
+    Returns:
+        bool: True si le placement est valide, False sinon.
+    """
+    bit = 1 << (num - 1)
+    if (row_mask[r] | col_mask[c]) & bit:
+        return False
+    if not allowed[r, c] & bit:
+        # num n'apparaît à cette position dans aucune permutation candidate
+        return False
+
+    board[r, c] = num
+    return (respect_clues(board, r, ROW, left, right, top, down, row_keys, row_key_counts)
+            and respect_clues(board, c, COL, left, right, top, down, row_keys, row_key_counts))
+
+
+@lru_cache(maxsize=None)
+def solver_for(n):
+    """
+    Fabrique le solveur de backtracking spécialisé pour une taille donnée.
+
+    La taille n est capturée par fermeture : Numba la fige en constante de
+    compilation, si bien que les bornes des boucles (balayage MRV, essai des
+    candidats) deviennent des littéraux que le JIT peut dérouler. Une seule
+    compilation par taille et par processus grâce à lru_cache ; le cache
+    disque de Numba ne couvrant pas les fermetures, cache=True est omis ici.
+
+    Args:
+        n (int): La taille du plateau.
+
+    Returns:
+        Callable: solve(board, row_mask, col_mask, allowed, left, right,
+        top, down, row_keys, row_key_counts) -> bool, compilée pour n.
+    """
+    # Table de Zobrist : un mot aléatoire de 64 bits par (ligne, colonne,
+    # valeur). La clé d'un état partiel est le XOR des mots de ses cellules
+    # remplies ; elle se met à jour en O(1) à chaque pose et annulation.
+    # Graine fixe pour rester déterministe d'une exécution à l'autre.
+    rng = np.random.RandomState(0x5CA1AB1E % (2**32))
+    zobrist = rng.randint(1, np.iinfo(np.int64).max,
+                          size=(n, n, n + 1)).astype(np.uint64)
+
+    @njit(boundscheck=False)
+    def solve(board, row_mask, col_mask, allowed, left, right, top, down,
+              row_keys, row_key_counts):
+        """
+        Résout le plateau par backtracking itératif, entièrement en code natif.
+
+        La récursion est remplacée par une pile explicite de cadres
+        (cellule choisie, candidats restants, valeur posée) : aucun appel de
+        fonction par nœud, l'annulation d'un essai se fait au dépilage. À
+        chaque descente, la cellule vide ayant le moins de candidats restants
+        est choisie (heuristique MRV, Minimum Remaining Values) ; si une
+        cellule vide n'a plus aucun candidat, la branche échoue immédiatement
+        (forward checking). Les états partiels prouvés sans issue sont
+        mémorisés par clé de Zobrist dans une table à adressage ouvert, et
+        tout état retrouvé par un autre ordre de placement est élagué sans
+        être re-exploré. Le plateau est rempli sur place ; en cas de succès
+        il contient la solution.
+
+        Args:
+            board (numpy.ndarray): Le plateau actuel (int8, N x N), modifié sur place.
+            row_mask, col_mask (numpy.ndarray): Masques des valeurs présentes (int32).
+            allowed (numpy.ndarray): Masques des valeurs envisageables par cellule (int32).
+            left, right, top, down (numpy.ndarray): Les indices du jeu (int32).
+
+        Returns:
+            bool: True si une solution a été trouvée, False sinon.
+        """
+
+        # Pile des cadres de recherche : au plus une cellule vide par cadre
+        fr_r = np.empty(n * n, dtype=np.int64)
+        fr_c = np.empty(n * n, dtype=np.int64)
+        fr_k = np.empty(n * n, dtype=np.int64)     # position dans la liste des vides
+        fr_cand = np.empty(n * n, dtype=np.int64)  # candidats non encore essayés
+        fr_val = np.empty(n * n, dtype=np.int64)   # valeur actuellement posée
+        sp = -1
+
+        # Liste explicite des cellules vides : le balayage MRV ne parcourt
+        # qu'elle, et non tout le plateau. Le retrait se fait par échange avec
+        # le dernier élément (et l'échange inverse au dépilage, la discipline
+        # LIFO garantissant la restauration exacte).
+        emp_r = np.empty(n * n, dtype=np.int64)
+        emp_c = np.empty(n * n, dtype=np.int64)
+        m = 0
+        for i in range(n):
+            for j in range(n):
+                if board[i, j] == 0:
+                    emp_r[m] = i
+                    emp_c[m] = j
+                    m += 1
+
+        # Table des états sans issue (« nogoods ») : adressage ouvert de
+        # taille fixe, clé Zobrist stockée telle quelle, 0 = case libre.
+        # Lossy par construction (un état peut être oublié), jamais faux :
+        # seule une clé réellement insérée peut être retrouvée.
+        nogoods = np.zeros(1 << 17, dtype=np.uint64)
+        ng_mask = np.uint64((1 << 17) - 1)
+        zkey = np.uint64(0)
+        for i in range(n):
+            for j in range(n):
+                if board[i, j] != 0:
+                    zkey ^= zobrist[i, j, board[i, j]]
+
+        while True:
+            # Descente : sélection MRV de la prochaine cellule vide, celle
+            # dont le masque de candidats (valeurs permises moins valeurs déjà
+            # présentes) est le plus petit. Une cellule sans candidat rend la
+            # branche insoluble.
+            best_t = -1
+            best_cand = 0
+            best_count = n + 1
+            dead = False
+
+            # État déjà prouvé sans issue par un autre ordre de placement ?
+            slot = (zkey ^ (zkey >> np.uint64(29))) & ng_mask
+            for p in range(8):
+                probe = (slot + np.uint64(p)) & ng_mask
+                v = nogoods[probe]
+                if v == zkey:
+                    dead = True
+                    break
+                if v == np.uint64(0):
+                    break
+
+            for t in range(m):
+                if dead:
+                    break
+                i = emp_r[t]
+                j = emp_c[t]
+                cand = allowed[i, j] & ~(row_mask[i] | col_mask[j])
+                if cand == 0:
+                    dead = True
+                    break
+                count = 0
+                bits = cand
+                while bits:
+                    bits &= bits - 1
+                    count += 1
+                if count < best_count:
+                    best_count = count
+                    best_cand = cand
+                    best_t = t
+                    if count == 1:
+                        # Single nu : la cellule est forcée, aucune autre ne
+                        # peut être mieux classée — on la pose sans finir le
+                        # balayage (propagation unitaire)
+                        break
+
+            if not dead:
+                if best_t < 0:
+                    # Plateau complet : chaque ligne et colonne a déjà été
+                    # validée par can_place au moment où sa dernière cellule a
+                    # été remplie, inutile de tout revérifier ici.
+                    return True
+                sp += 1
+                fr_r[sp] = emp_r[best_t]
+                fr_c[sp] = emp_c[best_t]
+                fr_k[sp] = best_t
+                fr_cand[sp] = best_cand
+                fr_val[sp] = 0
+                # Retire la cellule choisie de la liste des vides
+                m -= 1
+                emp_r[best_t], emp_r[m] = emp_r[m], emp_r[best_t]
+                emp_c[best_t], emp_c[m] = emp_c[m], emp_c[best_t]
+
+            # Essai / retour : trouve, en dépilant si besoin, un cadre ayant
+            # encore un candidat plaçable, et pose ce candidat.
+            placed = False
+            while not placed:
+                if sp < 0:
+                    return False
+                er = fr_r[sp]
+                ec = fr_c[sp]
+
+                # Annule la valeur actuellement posée par ce cadre, s'il y en a une
+                v = fr_val[sp]
+                if v != 0:
+                    bit = 1 << (v - 1)
+                    row_mask[er] ^= bit
+                    col_mask[ec] ^= bit
+                    board[er, ec] = 0
+                    zkey ^= zobrist[er, ec, v]
+
+                # Itère uniquement sur les bits restants du masque de candidats
+                num = 0
+                cand = fr_cand[sp]
+                while cand:
+                    num += 1
+                    hit = cand & 1
+                    cand >>= 1
+                    if not hit:
+                        continue
+                    fr_cand[sp] &= ~(1 << (num - 1))
+                    if can_place(board, er, ec, num, row_mask, col_mask, allowed,
+                                 left, right, top, down, row_keys, row_key_counts):
+                        bit = 1 << (num - 1)
+                        row_mask[er] |= bit
+                        col_mask[ec] |= bit
+                        fr_val[sp] = num
+                        zkey ^= zobrist[er, ec, num]
+                        placed = True
+                        break
+                    # can_place a écrit num dans la cellule : annule l'essai
+                    board[er, ec] = 0
+
+                if not placed:
+                    # Candidats épuisés : l'état courant (cellule du cadre
+                    # redevenue vide) est prouvé sans issue, mémorise sa clé
+                    slot = (zkey ^ (zkey >> np.uint64(29))) & ng_mask
+                    stored = False
+                    for p in range(8):
+                        probe = (slot + np.uint64(p)) & ng_mask
+                        v = nogoods[probe]
+                        if v == np.uint64(0) or v == zkey:
+                            nogoods[probe] = zkey
+                            stored = True
+                            break
+                    if not stored:
+                        # Voisinage plein : écrase la première case (cache
+                        # avec perte, sans incidence sur la correction)
+                        nogoods[slot] = zkey
+
+                    # La cellule redevient vide (échange inverse de celui
+                    # fait à l'empilage), dépile et reprend chez le parent
+                    t = fr_k[sp]
+                    emp_r[t], emp_r[m] = emp_r[m], emp_r[t]
+                    emp_c[t], emp_c[m] = emp_c[m], emp_c[t]
+                    m += 1
+                    fr_val[sp] = 0
+                    sp -= 1
+
+    return solve
@@ -9,23 +9,67 @@ Le backtracking est utilisé pour revenir en arrière lorsque des combinaisons
 incompatibles sont détectées.
 """
 
-from copy import deepcopy
+from itertools import permutations
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from _kernels import COL, ROW, can_place, respect_clues, solver_for
+
+def _solve_branch(args):
+    """
+    Travailleur de processus : explore le sous-arbre obtenu en plaçant num
+    dans la cellule racine choisie par _solve_parallel, et renvoie le
+    plateau résolu ou None.
+
+    Fonction de module (et non méthode) pour rester picklable par
+    multiprocessing ; chaque travailleur reçoit ses propres copies du
+    plateau et des masques.
+
+    Args:
+        args (tuple): (board, r, c, num, row_mask, col_mask, allowed,
+                       left, right, top, down, row_keys, row_key_counts).
+
+    Returns:
+        numpy.ndarray: Le plateau résolu, ou None si la branche échoue.
+    """
+    (board, r, c, num, row_mask, col_mask, allowed,
+     left, right, top, down, row_keys, row_key_counts) = args
+
+    if can_place(board, r, c, num, row_mask, col_mask, allowed,
+                 left, right, top, down, row_keys, row_key_counts):
+        bit = 1 << (num - 1)
+        row_mask[r] |= bit
+        col_mask[c] |= bit
+        solve = solver_for(board.shape[0])
+        if solve(board, row_mask, col_mask, allowed, left, right, top, down,
+                 row_keys, row_key_counts):
+            return board
+
+    return None
+
 
 class SolveBoard:
     def __init__(self, board, clues_horiz, clues_verti):
         """
         Initialise un SolveBoard avec un plateau, des indices horizontaux et verticaux.
-        
+
         Args:
             board (list[list[int]]): Le plateau de Skyscrapers initial.
             clues_horiz (list[list[int]]): Les indices horizontaux du Skyscrapers.
             clues_verti (list[list[int]]): Les indices verticaux du Skyscrapers.
         """
         self.N = len(board)
-        self.board = board
+        # Le plateau est stocké sous forme de tableau numpy int8 contigu :
+        # un octet par cellule, lignes et colonnes accessibles par vues sans copie.
+        self.board = np.asarray(board, dtype=np.int8).copy()
         self.clues_horiz = clues_horiz
         self.clues_verti = clues_verti
-        self.place_obvious_numbers()
+        # Indices convertis une seule fois en tableaux int32 pour les noyaux Numba
+        self._top = np.asarray(clues_horiz[0], dtype=np.int32)
+        self._down = np.asarray(clues_horiz[1], dtype=np.int32)
+        self._left = np.asarray(clues_verti[0], dtype=np.int32)
+        self._right = np.asarray(clues_verti[1], dtype=np.int32)
 
     def place_obvious_numbers(self):
         """
@@ -40,16 +84,16 @@ class SolveBoard:
         """
         for idx, (top_clue, down_clue) in enumerate(zip(self.clues_horiz[0], self.clues_horiz[1])):
             if top_clue == 1:
-                self.board[0][idx] = self.N
+                self.board[0, idx] = self.N
             elif top_clue == self.N:
                 for r in range(self.N):
-                    self.board[r][idx] = r + 1
+                    self.board[r, idx] = r + 1
 
             if down_clue == 1:
-                self.board[self.N-1][idx] = self.N
+                self.board[self.N-1, idx] = self.N
             elif down_clue == self.N:
                 for r in range(self.N-1, -1, -1):
-                    self.board[r][idx] = self.N - r
+                    self.board[r, idx] = self.N - r
 
     def place_obvious_numbers_vertical(self):
         """
@@ -57,178 +101,229 @@ class SolveBoard:
         """
         for idx, (left_clue, right_clue) in enumerate(zip(self.clues_verti[0], self.clues_verti[1])):
             if left_clue == 1:
-                self.board[idx][0] = self.N
+                self.board[idx, 0] = self.N
             elif left_clue == self.N:
                 for c in range(self.N):
-                    self.board[idx][c] = c + 1
+                    self.board[idx, c] = c + 1
 
             if right_clue == 1:
-                self.board[idx][self.N-1] = self.N
+                self.board[idx, self.N-1] = self.N
             elif right_clue == self.N:
                 for c in range(self.N-1, -1, -1):
-                    self.board[idx][c] = self.N - c
-
-    def full(self, current_board, i, to_check):
-        """
-        Vérifie si une ligne ou une colonne spécifiée dans le plateau est complète (toutes les cases remplies).
-
-        Args:
-            current_board (list[list[int]]): Le plateau actuel.
-            i (int): L'indice de la ligne ou de la colonne à vérifier.
-            to_check (str): "row" pour vérifier une ligne, "col" pour vérifier une colonne.
+                    self.board[idx, c] = self.N - c
 
-        Returns:
-            bool: True si la ligne ou la colonne est complète, False sinon.
+    def compute_row_candidates(self):
         """
-        if to_check == "row":
-            # Vérifie si toutes les valeurs dans la ligne spécifiée sont différentes de zéro
-            return all(val != 0 for val in current_board[i])
-        else:  # to_check == "col"
-            # Vérifie s'il y a une valeur nulle dans la colonne spécifiée
-            return all(current_board[c][i] != 0 for c in range(self.N))
-
-
-    def is_valid(self, current_board, r, c, num):
+        Énumère pour chaque ligne les permutations compatibles avec ses indices.
+
+        Pour N ≤ 7 il n'y a que N! permutations possibles par ligne, et très
+        peu survivent au filtre des indices gauche/droite et des cellules déjà
+        placées par place_obvious_numbers. Le filtre est entièrement
+        vectorisé : toutes les permutations forment une matrice (N!, N), les
+        comptages de visibilité s'obtiennent par np.maximum.accumulate (une
+        position est visible si elle égale son maximum courant) et chaque
+        ligne ne fait plus que des comparaisons de tableaux. Les colonnes
+        reçoivent le même traitement avec leurs indices haut/bas, puis lignes
+        et colonnes sont filtrées l'une contre l'autre jusqu'au point fixe
+        (cohérence d'arc) : une permutation de ligne ne survit que si chacune
+        de ses valeurs apparaît encore à cette position dans une permutation
+        de colonne, et réciproquement. Le OU des permutations retenues donne,
+        cellule par cellule, le masque des valeurs encore envisageables
+        (self.allowed), que le noyau de recherche consulte avant tout essai.
         """
-        Vérifie si placer un nombre dans la cellule (r, c) est une configuration valide.
+        perms = np.array(list(permutations(range(1, self.N + 1))), dtype=np.int8)
+        running_max = np.maximum.accumulate(perms, axis=1)
+        vis_front = (perms == running_max).sum(axis=1)
+        reversed_ = perms[:, ::-1]
+        vis_back = (reversed_ == np.maximum.accumulate(reversed_, axis=1)).sum(axis=1)
 
-        Args:
-            current_board (list[list[int]]): Le plateau actuel.
-            r (int): L'indice de ligne.
-            c (int): L'indice de colonne.
-            num (int): Le nombre à placer.
+        self.row_candidates = []
+        for r in range(self.N):
+            keep = (vis_front == self.clues_verti[0][r]) & (vis_back == self.clues_verti[1][r])
+            # La permutation doit prolonger les cellules déjà remplies
+            keep &= ((self.board[r] == 0) | (perms == self.board[r])).all(axis=1)
+            self.row_candidates.append(perms[keep])
+
+        col_candidates = []
+        for c in range(self.N):
+            keep = (vis_front == self.clues_horiz[0][c]) & (vis_back == self.clues_horiz[1][c])
+            keep &= ((self.board[:, c] == 0) | (perms == self.board[:, c])).all(axis=1)
+            col_candidates.append(perms[keep])
+
+        # Bornes « en escalier » des indices de colonnes : vu un indice k en
+        # haut de la colonne c, la cellule (i, c) ne peut dépasser N-k+1+i
+        # (une valeur plus haute cacherait trop de gratte-ciels pour que k
+        # soient visibles) ; symétriquement depuis le bas. Les bornes des
+        # indices de lignes sont déjà implicites dans les permutations
+        # candidates ci-dessus.
+        rows = np.arange(self.N, dtype=np.int32).reshape(-1, 1)
+        max_from_top = self.N - self._top.reshape(1, -1) + 1 + rows
+        max_from_down = self.N - self._down.reshape(1, -1) + 1 + (self.N - 1 - rows)
+        max_value = np.minimum(max_from_top, max_from_down).clip(1, self.N)
+        bounds = (np.int32(1) << max_value) - 1
+
+        # Point fixe de cohérence d'arc : les masques dérivés des colonnes
+        # éliminent des permutations de lignes, ce qui resserre les masques
+        # des lignes, et ainsi de suite jusqu'à stabilité. N étant petit,
+        # quelques itérations suffisent toujours.
+        allowed_rows = np.zeros((self.N, self.N), dtype=np.int32)
+        allowed_cols = np.zeros((self.N, self.N), dtype=np.int32)
+        while True:
+            allowed_cols[:] = 0
+            for c, candidates in enumerate(col_candidates):
+                if len(candidates):
+                    bits = np.int32(1) << (candidates.astype(np.int32) - 1)
+                    allowed_cols[:, c] = np.bitwise_or.reduce(bits, axis=0)
+
+            changed = False
+            for r in range(self.N):
+                candidates = self.row_candidates[r]
+                if len(candidates):
+                    bits = np.int32(1) << (candidates.astype(np.int32) - 1)
+                    keep = (bits & allowed_cols[r]).astype(bool).all(axis=1)
+                    if not keep.all():
+                        self.row_candidates[r] = candidates[keep]
+                        changed = True
+
+            allowed_rows[:] = 0
+            for r, candidates in enumerate(self.row_candidates):
+                if len(candidates):
+                    bits = np.int32(1) << (candidates.astype(np.int32) - 1)
+                    allowed_rows[r] = np.bitwise_or.reduce(bits, axis=0)
 
-        Returns:
-            bool: True si la configuration est valide, False sinon.
+            for c in range(self.N):
+                candidates = col_candidates[c]
+                if len(candidates):
+                    bits = np.int32(1) << (candidates.astype(np.int32) - 1)
+                    keep = (bits & allowed_rows[:, c]).astype(bool).all(axis=1)
+                    if not keep.all():
+                        col_candidates[c] = candidates[keep]
+                        changed = True
+
+            if not changed:
+                break
+
+        self.allowed = allowed_rows & allowed_cols & bounds
+
+        # Clés compactes (4 bits par cellule, voir _kernels.pack_line) des
+        # permutations candidates, triées par ligne pour la dichotomie du noyau.
+        shifts = np.uint32(4) * np.arange(self.N, dtype=np.uint32)
+        width = max(max((len(c) for c in self.row_candidates), default=0), 1)
+        self.row_keys = np.zeros((self.N, width), dtype=np.uint32)
+        self.row_key_counts = np.zeros(self.N, dtype=np.int32)
+        for r, candidates in enumerate(self.row_candidates):
+            keys = np.sort((candidates.astype(np.uint32) << shifts).sum(axis=1).astype(np.uint32))
+            self.row_key_counts[r] = len(keys)
+            self.row_keys[r, :len(keys)] = keys
+
+    def solve(self, parallel=False):
         """
-        for i in range(self.N):
-            if current_board[i][c] == num or current_board[r][i] == num:
-                return False
-
-        current_board[r][c] = num
-        return self.respect_clues_horiz(current_board, r) and self.respect_clues_verti(current_board, c)
+        Fonction principale pour résoudre le Skyscrapers.
 
-    def respect_clues_horiz(self, current_board, r):
-        """
-        Vérifie si les indices horizontaux sont respectés pour une ligne donnée.
+        Copie le plateau initial puis délègue tout le backtracking au noyau
+        compilé par _kernels.solver_for, qui remplit la copie sur place.
+        Avec parallel=True, les valeurs encore candidates de la cellule
+        choisie par l'heuristique MRV définissent des sous-arbres
+        indépendants, explorés chacun dans son propre processus ; le premier
+        qui aboutit gagne et les autres sont arrêtés.
 
         Args:
-            current_board (list[list[int]]): Le plateau actuel.
-            r (int): L'indice de ligne.
+            parallel (bool): Explorer les branches racines en parallèle.
 
         Returns:
-            bool: True si les indices horizontaux sont respectés, False sinon.
+            list[list[int]]: Le plateau résolu, ou None si aucune solution n'est trouvée.
         """
-        left = 0
-        max_ = -float("inf")
-
+        # Prétraitement au moment de la résolution (et non à la construction) :
+        # il porte ainsi sur l'état réel du plateau, même modifié entre-temps.
+        # Les deux étapes sont idempotentes si solve est rappelée.
+        self.place_obvious_numbers()
+        self.compute_row_candidates()
+
+        # Copie numpy directe : le plateau est un tableau plat d'int8, la
+        # machinerie récursive de deepcopy n'a rien à apporter ici.
+        initial_board = self.board.copy()
+
+        # Masques de bits des valeurs déjà présentes par ligne et par colonne
+        # (bit k à 1 si la valeur k+1 est placée), construits vectoriellement :
+        # chaque cellule devient son bit, puis OU cumulé par axe.
+        values = initial_board.astype(np.int32)
+        bits = (values > 0).astype(np.int32) << np.maximum(values - 1, 0)
+        row_mask = np.bitwise_or.reduce(bits, axis=1).astype(np.int32)
+        col_mask = np.bitwise_or.reduce(bits, axis=0).astype(np.int32)
+
+        # Les lignes et colonnes déjà complètes avant la recherche ne passeront
+        # jamais par can_place : on les valide une seule fois ici (le noyau ne
+        # revérifie plus le plateau entier à chaque feuille).
         for i in range(self.N):
-            if current_board[r][i] > max_:
-                left += 1
-                max_ = current_board[r][i]
-
-        if self.full(current_board, r, "row"):
-            right = 0
-            max_ = -float("inf")
-            for i in range(self.N-1, -1, -1):
-                if current_board[r][i] > max_:
-                    right += 1
-                    max_ = current_board[r][i]
-            return left == self.clues_verti[0][r] and right == self.clues_verti[1][r]
-
-        return left <= self.clues_verti[0][r]
-
-    def respect_clues_verti(self, current_board, c):
-        """
-        Vérifie si les indices verticaux sont respectés pour une colonne donnée.
-
-        Args:
-            current_board (list[list[int]]): Le plateau actuel.
-            c (int): L'indice de colonne.
-
-        Returns:
-            bool: True si les indices verticaux sont respectés, False sinon.
-        """
-        top = 0
-        max_ = -float("inf")
-
-        for j in range(self.N):
-            if current_board[j][c] > max_:
-                top += 1
-                max_ = current_board[j][c]
-
-        if self.full(current_board, c, "col"):
-            max_ = -float("inf")
-            down = 0
-            for j in range(self.N-1, -1, -1):
-                if current_board[j][c] > max_:
-                    down += 1
-                    max_ = current_board[j][c]
-            return top == self.clues_horiz[0][c] and down == self.clues_horiz[1][c]
-
-        return top <= self.clues_horiz[0][c]
-
-    def find_empty_cell(self, current_board):
-        """
-        Trouve la première cellule vide dans le plateau.
-
-        Args:
-            current_board (list[list[int]]): Le plateau actuel.
-
-        Returns:
-            tuple: Coordonnées de la première cellule vide, ou None si aucune cellule n'est vide.
-        """
-        for r in range(self.N):
-            for c in range(self.N):
-                if current_board[r][c] == 0:
-                    return (r, c)
+            if (initial_board[i] != 0).all() and not respect_clues(
+                    initial_board, i, ROW, self._left, self._right, self._top,
+                    self._down, self.row_keys, self.row_key_counts):
+                return None
+            if (initial_board[:, i] != 0).all() and not respect_clues(
+                    initial_board, i, COL, self._left, self._right, self._top,
+                    self._down, self.row_keys, self.row_key_counts):
+                return None
+
+        if parallel:
+            return self._solve_parallel(initial_board, row_mask, col_mask)
+
+        # Noyau spécialisé pour la taille du plateau (compilé au premier appel)
+        solve = solver_for(self.N)
+        if solve(initial_board, row_mask, col_mask, self.allowed,
+                 self._left, self._right, self._top, self._down,
+                 self.row_keys, self.row_key_counts):
+            # Reconvertit en listes Python pour l'affichage côté appelant
+            return initial_board.tolist()
         return None
 
-    def solve_recursive(self, current_board, r, c):
+    def _solve_parallel(self, initial_board, row_mask, col_mask):
         """
-        Fonction récursive pour résoudre le Skyscrapers.
+        Explore les branches de premier niveau dans un pool de processus.
+
+        La cellule de départ est choisie comme dans le noyau (heuristique
+        MRV : la cellule vide au masque de candidats le plus petit), et seules
+        ses valeurs encore candidates sont soumises comme sous-problèmes
+        indépendants ; imap_unordered rend les résultats dans l'ordre
+        d'arrivée et le pool est arrêté dès la première solution.
 
         Args:
-            current_board (list[list[int]]): Le plateau actuel.
-            r (int): L'indice de ligne.
-            c (int): L'indice de colonne.
+            initial_board (numpy.ndarray): Le plateau de départ (copie).
+            row_mask, col_mask (numpy.ndarray): Masques des valeurs présentes.
 
         Returns:
             list[list[int]]: Le plateau résolu, ou None si aucune solution n'est trouvée.
         """
-        empty_cell = self.find_empty_cell(current_board)
-
-        if empty_cell is None:
-            for i in range(self.N):
-                if not (self.respect_clues_horiz(current_board, i) and self.respect_clues_verti(current_board, i)):
-                    return None
-
-            return current_board
-
-        r, c = empty_cell
-        for num in range(1, self.N+1):
-            if self.is_valid(current_board, r, c, num):
-                new_board = deepcopy(current_board)
-                new_board[r][c] = num
-
-                # Appel récursif avec la nouvelle configuration
-                result = self.solve_recursive(new_board, r, c + 1)
+        empties = np.argwhere(initial_board == 0)
+        if len(empties) == 0:
+            # Plateau déjà complet (et validé dans solve)
+            return initial_board.tolist()
+
+        # Sélection MRV de la cellule racine, comme dans le noyau
+        best_cand = 0
+        best_count = self.N + 1
+        r = c = -1
+        for i, j in empties:
+            cand = int(self.allowed[i, j]) & ~(int(row_mask[i]) | int(col_mask[j]))
+            if cand == 0:
+                return None
+            count = bin(cand).count("1")
+            if count < best_count:
+                best_count = count
+                best_cand = cand
+                r, c = int(i), int(j)
+
+        branches = [
+            (initial_board.copy(), r, c, num, row_mask.copy(), col_mask.copy(),
+             self.allowed, self._left, self._right, self._top, self._down,
+             self.row_keys, self.row_key_counts)
+            for num in range(1, self.N + 1)
+            if best_cand >> (num - 1) & 1
+        ]
+
+        with Pool(processes=min(len(branches), cpu_count())) as pool:
+            for result in pool.imap_unordered(_solve_branch, branches):
                 if result is not None:
-                    return result
-
-                result = self.solve_recursive(new_board, r + 1, c)
-                if result is not None:
-                    return result
-
-        return None  # Aucune solution trouvée
-
-    def solve(self):
-        """
-        Fonction principale pour résoudre le Skyscrapers.
-
-        Returns:
-            list[list[int]]: Le plateau résolu, ou None si aucune solution n'est trouvée.
-        """
-        initial_board = deepcopy(self.board)
-        return self.solve_recursive(initial_board, 0, 0)
+                    pool.terminate()
+                    return result.tolist()
 
+        return None